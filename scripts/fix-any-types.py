@@ -4,29 +4,65 @@ TypeScript 'any' Type Replacement Script
 Systematically replaces 'any' types with more appropriate TypeScript types
 """
 
+import json
+import mmap
+import multiprocessing
 import os
 import re
+import sys
 import argparse
+from collections import deque
 from pathlib import Path
 from typing import List, Tuple, Dict
 
+# Optional native accelerator: a PyO3 module wrapping Rust's linear-time
+# regex crate, exposing replace_any(context, text) -> (new_text, count).
+# The pure-Python path below is always available and behaviorally identical
+try:
+    import fix_any_rs
+except ImportError:
+    fix_any_rs = None
+
+# Optional Hyperscan prefilter: tests every pattern against a file in one
+# SIMD pass. Hyperscan can't express lookarounds and picks matches by
+# leftmost start rather than Python's leftmost-first-alternative rule, so
+# it is only used as a fast "could anything match?" gate (HS_FLAG_PREFILTER
+# compiles a safe over-approximation); all rewriting stays in Python's re
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
 class TypeScriptAnyReplacer:
-    def __init__(self, dry_run: bool = False):
+    # Remembers (mtime_ns, size) of files that needed no changes, so
+    # repeated runs (CI, pre-commit) only pay for files that changed
+    cache_file = '.fix-any-cache.json'
+    # Per-pattern hit counts recorded by --profile and used on later runs
+    # to order the fused alternation by observed frequency
+    profile_file = '.fix-any-profile.json'
+
+    def __init__(self, dry_run: bool = False, profile: bool = False):
         self.dry_run = dry_run
+        self.profile = profile
+        self._hits: Dict[str, int] = {}
         self.changes_made = 0
         self.files_processed = 0
+        self._cache: Dict[str, List[int]] = {}
+        # Per-file report lines, flushed with a single stdout write per file
+        # so workers don't serialize on the stdout lock line by line
+        self._msgs: List[str] = []
         
         # Common replacement patterns
-        self.replacements = [
+        replacements = [
             # Function parameters and return types
             (r'\(value: any\)', '(value: unknown)'),
             (r'=> any\b', '=> unknown'),
             (r': any\[\]', ': unknown[]'),
-            (r': any\s*=', ': unknown ='),
+            (r': any[ \t]*=', ': unknown ='),
             
             # Object types
             (r'Record<string, any>', 'Record<string, unknown>'),
-            (r'Record<\w+, any>', lambda m: m.group(0).replace('any', 'unknown')),
+            (r'(Record<\w+,\s*)any(>)', r'\1unknown\2'),
             
             # Generic constraints
             (r'<T extends any>', '<T>'),
@@ -36,23 +72,25 @@ class TypeScriptAnyReplacer:
             (r'Array<any>', 'Array<unknown>'),
             (r'any\[\]', 'unknown[]'),
             
-            # Function types - be more careful here
-            (r'\(.*?: any\) => any', lambda m: m.group(0).replace('any', 'unknown')),
-            
+            # Function types - be more careful here; [^()\n]* instead of .*?
+            # keeps the engine from backtracking across long parameter lists
+            # and from pairing parens across lines in whole-file mode
+            (r'(\([^()\n]*: )any(\)\s*=>\s*)any', r'\1unknown\2unknown'),
+
             # Variable declarations
-            (r'const \w+: any\b', lambda m: m.group(0).replace('any', 'unknown')),
-            (r'let \w+: any\b', lambda m: m.group(0).replace('any', 'unknown')),
-            (r'var \w+: any\b', lambda m: m.group(0).replace('any', 'unknown')),
+            (r'(const \w+: )any\b', r'\1unknown'),
+            (r'(let \w+: )any\b', r'\1unknown'),
+            (r'(var \w+: )any\b', r'\1unknown'),
             
             # Property types
-            (r':\s*any(?=\s*[;,}])', ': unknown'),
+            (r':[ \t]*any(?=\s*[;,}])', ': unknown'),
             
             # Type assertions - be more careful
-            (r'as any(?=\s*[;,.\)]))', 'as unknown'),
+            (r'as any(?=\s*[;,.\)])', 'as unknown'),
         ]
         
         # Context-specific replacements for better type safety
-        self.context_replacements = {
+        context_replacements = {
             'validator': [
                 (r'\(v: any\)', '(v: unknown)'),
                 (r'\(value: any\)', '(value: unknown)'),
@@ -67,146 +105,444 @@ class TypeScriptAnyReplacer:
             ],
             'test_file': [
                 # In tests, we can be more permissive but still improve
-                (r'expect\(.*?: any\)', lambda m: m.group(0).replace('any', 'unknown')),
+                (r'(expect\([^)\n]*: )any(\))', r'\1unknown\2'),
             ]
         }
         
         # Files to exclude (where 'any' might be intentional)
-        self.exclude_patterns = [
+        exclude_patterns = [
             r'\.d\.ts$',  # Type definition files
             r'node_modules/',
             r'\.git/',
             r'dist/',
             r'build/',
         ]
-        
+
         # Patterns where 'any' should be preserved
-        self.preserve_patterns = [
+        preserve_patterns = [
             r'// @ts-ignore.*any',  # Explicitly ignored
             r'// eslint-disable.*any',  # ESLint disabled
             r'JSON\.parse\(.*\): any',  # JSON.parse often needs any
             r'window\.\w+.*: any',  # Window object extensions
         ]
 
+        # Compile everything once up front so the per-line hot loop only
+        # deals with re.Pattern objects (no per-call cache lookup/hashing)
+        self.replacements = self._compile_replacements(replacements)
+        self.context_replacements = {
+            context: self._compile_replacements(pairs)
+            for context, pairs in context_replacements.items()
+        }
+        self.exclude_patterns = self._compile_patterns(exclude_patterns)
+        self.preserve_patterns = self._compile_patterns(preserve_patterns)
+
+        # Preserve check: cheap literal prefilter first, fused alternation
+        # second. The literals must cover every pattern above so a miss on
+        # all of them proves no preserve pattern can match
+        self._preserve_literals = ('@ts-ignore', 'eslint-disable', 'JSON.parse', 'window.')
+        self._preserve_re = re.compile(
+            '|'.join(pattern.pattern for pattern in self.preserve_patterns)
+        ) if self.preserve_patterns else None
+
+        # Context keywords found in one scan instead of one 'in' sweep per
+        # keyword; the lookahead keeps overlapping hits (e.g. 'clientest')
+        self._context_kw_re = re.compile(
+            r'(?=(test|spec|validator|validation|api|client|response|error|exception))')
+
+        # Directory names pruned with an O(1) set lookup in the walker;
+        # regex matching is reserved for user-supplied --exclude patterns
+        self._exclude_names = {'node_modules', '.git', 'dist', 'build'}
+        self.user_exclude_patterns: List[re.Pattern] = []
+
+        # Fuse the plain string replacements into a single alternation so each
+        # line is scanned once instead of once per pattern. Callable
+        # replacements and patterns with capture groups can't be merged
+        # (group numbering would shift), so they stay in a small fallback list
+        simple = []
+        self._complex_replacements = []
+        for pattern, replacement in self.replacements:
+            if callable(replacement) or pattern.groups:
+                self._complex_replacements.append((pattern, replacement))
+            else:
+                simple.append((pattern, replacement))
+
+        # With profile data from an earlier --profile run, order the fused
+        # alternation by observed hit frequency and demote never-matching
+        # patterns to a separate cold alternation. When re-profiling,
+        # everything stays hot so counts are collected for every pattern
+        hits = self._load_profile()
+        cold = []
+        if hits is not None:
+            simple.sort(key=lambda pair: -hits.get(pair[0].pattern, 0))
+            if not self.profile:
+                cold = [pair for pair in simple if hits.get(pair[0].pattern, 0) == 0]
+                simple = [pair for pair in simple if hits.get(pair[0].pattern, 0) > 0]
+        self._simple_patterns = [pattern.pattern for pattern, _ in simple]
+        self._simple_repls = [replacement for _, replacement in simple]
+        self._cold_repls = [replacement for _, replacement in cold]
+        self._combined = self._fuse(simple)
+        self._combined_cold = self._fuse(cold)
+
+        # Every pattern that could cause a change, for the Hyperscan gate:
+        # a file where none of these fire can be skipped outright
+        self._hs_exprs = [pattern.pattern.encode('utf-8') for pattern, _ in self.replacements]
+        for pairs in self.context_replacements.values():
+            self._hs_exprs.extend(pattern.pattern.encode('utf-8') for pattern, _ in pairs)
+        self._hs_db = None
+        self._build_hs_db()
+
+    @staticmethod
+    def _fuse(pairs: List[Tuple]) -> re.Pattern:
+        """Build one named-group alternation from compiled (pattern, repl) pairs"""
+        if not pairs:
+            return None
+        return re.compile(
+            '|'.join(f'(?P<g{i}>{pattern.pattern})' for i, (pattern, _) in enumerate(pairs)))
+
+    def _build_hs_db(self) -> None:
+        """Compile the optional Hyperscan prefilter database"""
+        if hyperscan is None:
+            return
+        try:
+            db = hyperscan.Database()
+            db.compile(
+                expressions=self._hs_exprs,
+                ids=list(range(len(self._hs_exprs))),
+                flags=[hyperscan.HS_FLAG_PREFILTER | hyperscan.HS_FLAG_SINGLEMATCH]
+                * len(self._hs_exprs),
+            )
+            self._hs_db = db
+        except hyperscan.error as e:
+            print(f"Warning: Hyperscan prefilter unavailable: {e}")
+
+    def __getstate__(self):
+        # Hyperscan databases don't pickle; pool workers rebuild their own
+        state = self.__dict__.copy()
+        state['_hs_db'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._build_hs_db()
+
+    def _hs_candidate(self, data: bytes) -> bool:
+        """Return True unless the Hyperscan gate proves no pattern can match"""
+        if self._hs_db is None:
+            return True
+        found = False
+
+        def on_match(pat_id, start, end, flags, context=None):
+            nonlocal found
+            found = True
+            return True  # terminate the scan at the first hit
+
+        try:
+            self._hs_db.scan(data, match_event_handler=on_match)
+        except hyperscan.error:
+            return True  # be conservative and let the Python engine decide
+        return found
+
+    def _dispatch(self, match: re.Match) -> str:
+        """Look up the replacement for whichever alternative of the fused pattern matched"""
+        index = int(match.lastgroup[1:])
+        if self.profile:
+            pattern = self._simple_patterns[index]
+            self._hits[pattern] = self._hits.get(pattern, 0) + 1
+        return self._simple_repls[index]
+
+    def _dispatch_cold(self, match: re.Match) -> str:
+        """Replacement lookup for the cold (zero-observed-hits) alternation"""
+        return self._cold_repls[int(match.lastgroup[1:])]
+
+    def _load_profile(self):
+        try:
+            with open(self.profile_file, 'r', encoding='utf-8') as f:
+                hits = json.load(f)
+            if isinstance(hits, dict):
+                return hits
+        except (IOError, ValueError):
+            pass
+        return None
+
+    def _save_profile(self) -> None:
+        counts = {pattern: self._hits.get(pattern, 0) for pattern in self._simple_patterns}
+        try:
+            with open(self.profile_file, 'w', encoding='utf-8') as f:
+                json.dump(counts, f)
+        except IOError as e:
+            print(f"Warning: Could not save {self.profile_file}: {e}")
+
+    def _compile_patterns(self, patterns: List[str]) -> List[re.Pattern]:
+        """Compile raw pattern strings, warning about and dropping invalid ones"""
+        compiled = []
+        for pattern in patterns:
+            try:
+                compiled.append(re.compile(pattern))
+            except re.error as e:
+                print(f"Warning: Regex error with pattern '{pattern}': {e}")
+        return compiled
+
+    def _compile_replacements(self, pairs: List[Tuple]) -> List[Tuple]:
+        """Compile (pattern, replacement) pairs, warning about and dropping invalid ones"""
+        compiled = []
+        for pattern, replacement in pairs:
+            try:
+                compiled.append((re.compile(pattern), replacement))
+            except re.error as e:
+                print(f"Warning: Regex error with pattern '{pattern}': {e}")
+        return compiled
+
     def should_exclude_file(self, file_path: str) -> bool:
         """Check if file should be excluded from processing"""
         for pattern in self.exclude_patterns:
-            if re.search(pattern, file_path):
+            if pattern.search(file_path):
+                return True
+        for pattern in self.user_exclude_patterns:
+            if pattern.search(file_path):
                 return True
         return False
 
     def should_preserve_line(self, line: str) -> bool:
         """Check if a line should preserve 'any' types"""
-        for pattern in self.preserve_patterns:
-            if re.search(pattern, line):
-                return True
-        return False
+        if self._preserve_re is None:
+            return False
+        if not any(literal in line for literal in self._preserve_literals):
+            return False
+        return self._preserve_re.search(line) is not None
 
     def get_file_context(self, file_path: str) -> str:
         """Determine the context of the file for targeted replacements"""
-        path_lower = file_path.lower()
-        
-        if 'test' in path_lower or 'spec' in path_lower:
+        hits = set(self._context_kw_re.findall(file_path.lower()))
+
+        if 'test' in hits or 'spec' in hits:
             return 'test_file'
-        elif 'validator' in path_lower or 'validation' in path_lower:
+        elif 'validator' in hits or 'validation' in hits:
             return 'validator'
-        elif 'api' in path_lower and ('client' in path_lower or 'response' in path_lower):
+        elif 'api' in hits and ('client' in hits or 'response' in hits):
             return 'api_response'
-        elif 'error' in path_lower or 'exception' in path_lower:
+        elif 'error' in hits or 'exception' in hits:
             return 'error_handler'
-        
+
         return 'general'
 
     def process_line(self, line: str, file_context: str) -> Tuple[str, int]:
         """Process a single line and return modified line and change count"""
+        # Fast path: every pattern needs the literal 'any', and a substring
+        # check is orders of magnitude cheaper than the regex battery
+        if 'any' not in line:
+            return line, 0
+
         if self.should_preserve_line(line):
             return line, 0
-        
-        original_line = line
+
         changes = 0
         
         # Apply context-specific replacements first
         if file_context in self.context_replacements:
             for pattern, replacement in self.context_replacements[file_context]:
-                if callable(replacement):
-                    new_line = re.sub(pattern, replacement, line)
-                else:
-                    new_line = re.sub(pattern, replacement, line)
-                if new_line != line:
-                    line = new_line
-                    changes += 1
-        
-        # Apply general replacements
-        for pattern, replacement in self.replacements:
-            try:
-                if callable(replacement):
-                    new_line = re.sub(pattern, replacement, line)
-                else:
-                    new_line = re.sub(pattern, replacement, line)
-                if new_line != line:
-                    line = new_line
-                    changes += 1
-            except re.error as e:
-                print(f"Warning: Regex error with pattern '{pattern}': {e}")
-                continue
-        
+                line, n = pattern.subn(replacement, line)
+                changes += n
+
+        # Apply general replacements: one fused pass for the simple patterns,
+        # then the handful that need backreferences
+        if self._combined is not None:
+            line, n = self._combined.subn(self._dispatch, line)
+            changes += n
+        if self._combined_cold is not None:
+            line, n = self._combined_cold.subn(self._dispatch_cold, line)
+            changes += n
+        for pattern, replacement in self._complex_replacements:
+            line, n = pattern.subn(replacement, line)
+            changes += n
+
         return line, changes
 
+    def process_text(self, text: str, file_context: str) -> Tuple[str, int]:
+        """Apply the replacement battery to a whole file's text in one pass"""
+        changes = 0
+
+        # Apply context-specific replacements first
+        if file_context in self.context_replacements:
+            for pattern, replacement in self.context_replacements[file_context]:
+                text, n = pattern.subn(replacement, text)
+                changes += n
+
+        # Apply general replacements
+        if self._combined is not None:
+            text, n = self._combined.subn(self._dispatch, text)
+            changes += n
+        if self._combined_cold is not None:
+            text, n = self._combined_cold.subn(self._dispatch_cold, text)
+            changes += n
+        for pattern, replacement in self._complex_replacements:
+            text, n = pattern.subn(replacement, text)
+            changes += n
+
+        return text, changes
+
     def process_file(self, file_path: str) -> bool:
         """Process a single TypeScript file"""
         if self.should_exclude_file(file_path):
             return False
-        
+
+        # One open + fstat covers the cache check, the mapping, and the
+        # fallback read; no separate stat or buffered-I/O layer per file
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-        except (UnicodeDecodeError, IOError) as e:
+            fd = os.open(file_path, os.O_RDONLY)
+        except OSError as e:
             print(f"Warning: Could not read {file_path}: {e}")
             return False
-        
+        try:
+            st = os.fstat(fd)
+            if self._cache.get(file_path) == [st.st_mtime_ns, st.st_size]:
+                return False  # known clean from a previous run
+
+            try:
+                # Map rather than read: the gates below scan the page
+                # cache in place, so clean files (the overwhelming
+                # majority) never allocate a copy of their contents
+                buf = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                buf = os.read(fd, st.st_size)  # empty or unmappable file
+            try:
+                # Fast path: skip files that contain no 'any' at all
+                # before paying for the decode and the regex passes.
+                # find() rather than 'in': mmap has no __contains__
+                if buf.find(b'any') < 0:
+                    self._note_clean(file_path, st)
+                    return False
+                # Second gate: one multi-pattern Hyperscan pass
+                if not self._hs_candidate(buf):
+                    self._note_clean(file_path, st)
+                    return False
+                data = buf[:] if isinstance(buf, mmap.mmap) else buf
+            finally:
+                if isinstance(buf, mmap.mmap):
+                    buf.close()
+        except OSError as e:
+            print(f"Warning: Could not read {file_path}: {e}")
+            return False
+        finally:
+            os.close(fd)
+
+        try:
+            text = data.decode('utf-8')
+        except UnicodeDecodeError as e:
+            print(f"Warning: Could not read {file_path}: {e}")
+            return False
+
         file_context = self.get_file_context(file_path)
-        modified_lines = []
-        file_changes = 0
-        
-        for line_num, line in enumerate(lines, 1):
-            modified_line, line_changes = self.process_line(line, file_context)
-            modified_lines.append(modified_line)
-            file_changes += line_changes
-            
-            if line_changes > 0 and not self.dry_run:
-                print(f"  Line {line_num}: {line.strip()} -> {modified_line.strip()}")
-        
+
+        if self.should_preserve_line(text):
+            # Preserve markers present: fall back to line-by-line so the
+            # marked lines can be masked from the replacement battery
+            modified_lines = []
+            file_changes = 0
+            for line in text.splitlines(keepends=True):
+                modified_line, line_changes = self.process_line(line, file_context)
+                modified_lines.append(modified_line)
+                file_changes += line_changes
+            new_text = ''.join(modified_lines)
+        else:
+            # Common case: none of the patterns span newlines, so the whole
+            # file can go through the battery in a single pass
+            if fix_any_rs is not None:
+                new_text, file_changes = fix_any_rs.replace_any(file_context, text)
+            else:
+                new_text, file_changes = self.process_text(text, file_context)
+
         if file_changes > 0:
             if self.dry_run:
-                print(f"[DRY RUN] Would modify {file_path}: {file_changes} changes")
+                self._msgs.append(f"[DRY RUN] Would modify {file_path}: {file_changes} changes\n")
             else:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.writelines(modified_lines)
-                print(f"Modified {file_path}: {file_changes} changes")
-            
+                for line_num, (line, modified_line) in enumerate(
+                        zip(text.splitlines(), new_text.splitlines()), 1):
+                    if line != modified_line:
+                        self._msgs.append(
+                            f"  Line {line_num}: {line.strip()} -> {modified_line.strip()}\n")
+                with open(file_path, 'wb') as f:
+                    f.write(new_text.encode('utf-8'))
+                self._msgs.append(f"Modified {file_path}: {file_changes} changes\n")
+
             self.changes_made += file_changes
             return True
-        
+
+        self._note_clean(file_path, st)
         return False
 
+    def _iter_ts(self, root: str):
+        """Yield TypeScript source files under root, pruning excluded directories"""
+        pending = deque([root])
+        while pending:
+            directory = pending.popleft()
+            try:
+                entries = os.scandir(directory)
+            except OSError as e:
+                print(f"Warning: Could not scan {directory}: {e}")
+                continue
+            with entries:
+                for entry in entries:
+                    name = entry.name
+                    if name in self._exclude_names:
+                        continue
+                    # scandir already joined dir + sep + name in C
+                    path = entry.path
+                    if self.user_exclude_patterns and any(
+                            pattern.search(path) for pattern in self.user_exclude_patterns):
+                        continue
+                    # DirEntry caches the type from the scandir syscall, so
+                    # is_dir() normally costs no extra stat
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(path)
+                    elif name.endswith(('.ts', '.tsx')) and not name.endswith('.d.ts'):
+                        yield path
+
     def find_typescript_files(self, directory: str) -> List[str]:
         """Find all TypeScript files in directory"""
-        ts_files = []
-        
-        for root, dirs, files in os.walk(directory):
-            # Skip excluded directories
-            dirs[:] = [d for d in dirs if not any(re.search(pattern, os.path.join(root, d)) for pattern in self.exclude_patterns)]
-            
-            for file in files:
-                if file.endswith(('.ts', '.tsx')) and not file.endswith('.d.ts'):
-                    file_path = os.path.join(root, file)
-                    if not self.should_exclude_file(file_path):
-                        ts_files.append(file_path)
-        
-        return sorted(ts_files)
+        return sorted(self._iter_ts(directory))
+
+    def _note_clean(self, file_path: str, st) -> None:
+        """Record that a file needed no changes at its current mtime/size"""
+        if st is not None:
+            self._cache[file_path] = [st.st_mtime_ns, st.st_size]
+
+    def _load_cache(self) -> None:
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            if isinstance(cache, dict):
+                self._cache = cache
+        except (IOError, ValueError):
+            self._cache = {}
+
+    def _save_cache(self) -> None:
+        if self.dry_run:
+            return  # dry runs consult the cache but never update it
+        try:
+            with open(self.cache_file, 'w', encoding='utf-8') as f:
+                json.dump(self._cache, f)
+        except IOError as e:
+            print(f"Warning: Could not save {self.cache_file}: {e}")
+
+    def _flush_msgs(self) -> None:
+        """Emit the buffered report for the current file in one write"""
+        if self._msgs:
+            sys.stdout.write(''.join(self._msgs))
+            self._msgs = []
+
+    def _process_file_worker(self, file_path: str) -> Tuple[str, bool, int, List[int], List[str]]:
+        """Pool worker entry point: process one file and report the result"""
+        before = self.changes_made
+        modified = self.process_file(file_path)
+        # Cache updates and report lines made in the worker would be lost;
+        # ship them back so the parent can merge and emit them
+        msgs, self._msgs = self._msgs, []
+        return file_path, modified, self.changes_made - before, self._cache.get(file_path), msgs
 
     def run(self, directories: List[str]) -> None:
         """Run the replacement process on specified directories"""
+        self._load_cache()
+
         all_files = []
         
         for directory in directories:
@@ -221,12 +557,36 @@ class TypeScriptAnyReplacer:
             print("=== DRY RUN MODE - No files will be modified ===")
         
         files_modified = 0
+        # Profiling stays serial: hit counts incremented in pool workers
+        # would never make it back to the parent
+        workers = 1 if self.profile else (os.cpu_count() or 1)
+
+        if workers > 1 and len(all_files) > 1:
+            # File processing is independent per file, so fan it out across
+            # CPUs; each worker processes (and writes) its own files and
+            # reports counts back for aggregation
+            with multiprocessing.Pool(workers) as pool:
+                for path, modified, file_changes, cache_key, msgs in pool.imap_unordered(
+                        self._process_file_worker, all_files, chunksize=32):
+                    self.files_processed += 1
+                    self.changes_made += file_changes
+                    if modified:
+                        files_modified += 1
+                    if cache_key is not None:
+                        self._cache[path] = cache_key
+                    if msgs:
+                        sys.stdout.write(''.join(msgs))
+        else:
+            for file_path in all_files:
+                self.files_processed += 1
+                if self.process_file(file_path):
+                    files_modified += 1
+                self._flush_msgs()
         
-        for file_path in all_files:
-            self.files_processed += 1
-            if self.process_file(file_path):
-                files_modified += 1
-        
+        self._save_cache()
+        if self.profile:
+            self._save_profile()
+
         print(f"\nSummary:")
         print(f"  Files processed: {self.files_processed}")
         print(f"  Files modified: {files_modified}")
@@ -240,14 +600,16 @@ def main():
     parser.add_argument('paths', nargs='+', help='Directories or files to process')
     parser.add_argument('--dry-run', action='store_true', help='Show what would be changed without modifying files')
     parser.add_argument('--exclude', action='append', help='Additional exclude patterns (regex)')
-    
+    parser.add_argument('--profile', action='store_true',
+                        help='Record per-pattern hit counts to speed up later runs')
+
     args = parser.parse_args()
-    
-    replacer = TypeScriptAnyReplacer(dry_run=args.dry_run)
+
+    replacer = TypeScriptAnyReplacer(dry_run=args.dry_run, profile=args.profile)
     
     # Add custom exclude patterns
     if args.exclude:
-        replacer.exclude_patterns.extend(args.exclude)
+        replacer.user_exclude_patterns.extend(replacer._compile_patterns(args.exclude))
     
     try:
         replacer.run(args.paths)